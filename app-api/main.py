@@ -1,42 +1,91 @@
 from __future__ import annotations
 
+import asyncio
+import collections
 import contextlib
-import datetime as _dt
-import json
+import functools
+import hashlib
+import logging
 import os
 import pathlib
+import re
 import sqlite3
+import threading
+import time
 import typing as t
 
+import httpx
+import orjson
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
 MOCK = os.getenv("MOCK_MODE", "0") == "1"
 _DB_PATH = pathlib.Path(os.getenv("DB_PATH", "api-log.db")).resolve()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def _make_client(max_keepalive_connections: int = 100) -> AsyncOpenAI:
+    """Build an OpenAI client on its own HTTP/2 connection pool.
+
+    Concurrent requests are multiplexed over a few TLS connections instead of
+    one per request. Pooled connections belong to the event loop that opened
+    them, so each lifespan gets a fresh client.
+    """
+
+    http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=200, max_keepalive_connections=max_keepalive_connections
+        ),
+    )
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http)
+
+
+# Fallback used outside the lifespan, where each call may run on a different
+# event loop; it keeps no idle connections so none outlive their loop.
+client = _make_client(max_keepalive_connections=0)
 
 
 def _timestamp() -> str:
     """Return an ISO8601 timestamp ending with Z."""
 
-    return (
-        _dt.datetime.now(_dt.timezone.utc)
-        .replace(microsecond=0)
-        .isoformat()
-        .replace("+00:00", "Z")
-    )
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the shared sqlite connection in WAL mode."""
+
+    _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(_DB_PATH, check_same_thread=False, isolation_level=None)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
+
+
+_CONN: sqlite3.Connection | None = None
+_WRITE_LOCK = threading.Lock()
+
+
+def _db() -> sqlite3.Connection:
+    """Return the process-wide sqlite connection, opening it on first use."""
+
+    global _CONN
+    if _CONN is None:
+        with _WRITE_LOCK:
+            if _CONN is None:
+                _CONN = _connect()
+    return _CONN
 
 
 def _init_db() -> None:
     """Initialise the sqlite database if required."""
 
-    _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(_DB_PATH) as con:
+    con = _db()
+    with _WRITE_LOCK:
         con.execute(
             """
             CREATE TABLE IF NOT EXISTS logs (
@@ -50,28 +99,103 @@ def _init_db() -> None:
         )
 
 
-@contextlib.contextmanager
-def _db() -> t.Iterator[sqlite3.Connection]:
-    """Context manager that yields a sqlite connection."""
+_LogRow = tuple[str, str, str, str]
 
-    con = sqlite3.connect(_DB_PATH)
-    con.row_factory = sqlite3.Row
+# A future on the queue is a flush marker, resolved once every row ahead of it
+# has been written.
+_LogItem = _LogRow | asyncio.Future[None]
+
+_LOG_BATCH = 64
+LOG_Q: asyncio.Queue[_LogItem] | None = None
+
+
+def _write_logs(rows: list[_LogRow]) -> None:
+    """Insert ``rows`` in a single transaction."""
+
+    con = _db()
+    with _WRITE_LOCK:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany(
+                "INSERT INTO logs(ts, mode, input, output) VALUES(?, ?, ?, ?)",
+                rows,
+            )
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+
+async def _log_writer() -> None:
+    """Drain ``LOG_Q`` forever, writing whatever has queued up as one batch."""
+
+    assert LOG_Q is not None
+    while True:
+        batch = [await LOG_Q.get()]
+        while len(batch) < _LOG_BATCH and not LOG_Q.empty():
+            batch.append(LOG_Q.get_nowait())
+        rows = [item for item in batch if isinstance(item, tuple)]
+        try:
+            if rows:
+                await asyncio.to_thread(_write_logs, rows)
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("failed to write %d log rows", len(rows))
+        finally:
+            for item in batch:
+                if isinstance(item, asyncio.Future) and not item.done():
+                    item.set_result(None)
+                LOG_Q.task_done()
+
+
+async def _flush_logs() -> None:
+    """Wait until every row queued before this call has been written.
+
+    Rows queued afterwards are not waited for, so a steady stream of writes
+    cannot hold the caller up.
+    """
+
+    if LOG_Q is None:
+        return
+    marker: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+    LOG_Q.put_nowait(marker)
+    await marker
+
+
+def _record_log(mode: str, inp: BaseModel, out: t.Mapping[str, t.Any]) -> None:
+    payload_in = inp.model_dump_json()
+    payload_out = orjson.dumps(out).decode()
+    row = (_timestamp(), mode, payload_in, payload_out)
+    if LOG_Q is None:
+        # No writer task outside the app lifespan, which is also what normally
+        # creates the table; set it up and write synchronously.
+        _init_db()
+        _write_logs([row])
+    else:
+        LOG_Q.put_nowait(row)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> t.AsyncIterator[None]:
+    global LOG_Q, _GEN_Q, client
+    _init_db()
+    fallback, client = client, _make_client()
+    LOG_Q = asyncio.Queue()
+    _GEN_Q = asyncio.Queue()
+    tasks = [asyncio.create_task(_log_writer()), asyncio.create_task(_coalescer())]
     try:
-        yield con
-        con.commit()
+        yield
     finally:
-        con.close()
+        await LOG_Q.join()
+        tasks.extend(_DISPATCHES)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        LOG_Q = _GEN_Q = None
+        await client.close()
+        client = fallback
 
 
-def _record_log(mode: str, inp: t.Mapping[str, t.Any], out: t.Mapping[str, t.Any]) -> None:
-    payload_in = json.dumps(inp, ensure_ascii=False)
-    payload_out = json.dumps(out, ensure_ascii=False)
-    with _db() as con:
-        con.execute(
-            "INSERT INTO logs (ts, mode, input, output) VALUES (?, ?, ?, ?)",
-            (_timestamp(), mode, payload_in, payload_out),
-        )
-        con.commit()
+app = FastAPI(lifespan=lifespan)
 
 
 def _ensure_api_key() -> None:
@@ -79,6 +203,138 @@ def _ensure_api_key() -> None:
         raise HTTPException(status_code=500, detail="Missing OPENAI_API_KEY")
 
 
+_RESET_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_RESET_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_reset(value: str | None) -> float:
+    """Convert an ``x-ratelimit-reset-*`` duration such as ``6m0s`` to seconds."""
+
+    if not value:
+        return 0.0
+    return sum(float(num) * _RESET_UNITS[unit] for num, unit in _RESET_RE.findall(value))
+
+
+class RateLimiter:
+    """Concurrency cap plus request/token budgets fed by ``x-ratelimit-*`` headers.
+
+    Budgets are unknown (``None``) until the first response arrives; after that
+    each reservation spends from them and waits for the advertised reset once
+    they run dry.
+    """
+
+    def __init__(self, max_concurrency: int = 250) -> None:
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.req_tokens: float | None = None
+        self.tok_tokens: float | None = None
+        self._req_reset = 0.0
+        self._tok_reset = 0.0
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, est_tokens: int) -> t.AsyncIterator[None]:
+        async with self._sem:
+            await self._wait_for_budget(est_tokens)
+            if self.req_tokens is not None:
+                self.req_tokens -= 1
+            if self.tok_tokens is not None:
+                self.tok_tokens -= est_tokens
+            yield
+
+    async def _wait_for_budget(self, est_tokens: int) -> None:
+        while True:
+            now = time.monotonic()
+            if self.req_tokens is not None and self.req_tokens < 1:
+                if now < self._req_reset:
+                    await asyncio.sleep(self._req_reset - now)
+                    continue
+                self.req_tokens = None
+            if self.tok_tokens is not None and self.tok_tokens < est_tokens:
+                if now < self._tok_reset:
+                    await asyncio.sleep(self._tok_reset - now)
+                    continue
+                self.tok_tokens = None
+            return
+
+    def update(self, headers: t.Mapping[str, str]) -> None:
+        now = time.monotonic()
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None:
+            self.req_tokens = float(remaining)
+            self._req_reset = now + _parse_reset(headers.get("x-ratelimit-reset-requests"))
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if remaining is not None:
+            self.tok_tokens = float(remaining)
+            self._tok_reset = now + _parse_reset(headers.get("x-ratelimit-reset-tokens"))
+
+
+limiter = RateLimiter()
+
+_COMPLETION_TOKEN_ESTIMATE = 256
+
+
+def _estimate_tokens(messages: t.Iterable[t.Mapping[str, str]]) -> int:
+    return sum(len(m["content"]) for m in messages) // 4 + _COMPLETION_TOKEN_ESTIMATE
+
+
+async def _create_completion(**kwargs: t.Any) -> t.Any:
+    """Call ``chat.completions.create`` through the shared rate limiter."""
+
+    async with limiter.reserve(_estimate_tokens(kwargs["messages"])):
+        raw = await client.chat.completions.with_raw_response.create(**kwargs)
+    limiter.update(raw.headers)
+    return raw.parse()
+
+
+_MODEL = "gpt-4o-mini"
+
+
+def _messages(system: t.Mapping[str, str] | None, user: str) -> list[t.Mapping[str, str]]:
+    message = {"role": "user", "content": user}
+    return [message] if system is None else [system, message]
+
+
+async def _chat(system: t.Mapping[str, str] | None, user: str, temperature: float) -> str:
+    """Run one chat completion and return its text, surfacing failures as a 500."""
+
+    _ensure_api_key()
+    try:
+        resp = await _create_completion(
+            model=_MODEL, messages=_messages(system, user), temperature=temperature
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return resp.choices[0].message.content
+
+
+_RESP_CACHE_SIZE = 1024
+_CACHE_MAX_TEMPERATURE = 0.3
+_RESP_CACHE: collections.OrderedDict[tuple[str, str], t.Any] = collections.OrderedDict()
+
+
+def _cache_key(endpoint: str, text: str) -> tuple[str, str]:
+    return endpoint, hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _cache_get(endpoint: str, text: str, temperature: float) -> t.Any | None:
+    """Return a cached LLM result for ``text`` or ``None`` on a miss."""
+
+    if temperature > _CACHE_MAX_TEMPERATURE:
+        return None
+    key = _cache_key(endpoint, text)
+    value = _RESP_CACHE.get(key)
+    if value is not None:
+        _RESP_CACHE.move_to_end(key)
+    return value
+
+
+def _cache_put(endpoint: str, text: str, temperature: float, value: t.Any) -> None:
+    if temperature > _CACHE_MAX_TEMPERATURE:
+        return
+    _RESP_CACHE[_cache_key(endpoint, text)] = value
+    if len(_RESP_CACHE) > _RESP_CACHE_SIZE:
+        _RESP_CACHE.popitem(last=False)
+
+
 class GenIn(BaseModel):
     prompt: str
 
@@ -96,170 +352,390 @@ def _clean_text(value: str) -> str:
     return value.strip()
 
 
+# System prompts are shared across requests; only the user message is built per call.
+_TITLE_SYS = {"role": "system", "content": "Provide a concise title."}
+_SUMMARY_SYS = {"role": "system", "content": "Summarize the following text."}
+_KEYWORDS_SYS = {
+    "role": "system",
+    "content": "Extract distinct keywords as a comma separated list.",
+}
+
+
+# Fixed Latin-1 ``str.translate`` table mapping every non-``\w`` character to a
+# space; characters missing from it are left as they are. Text outside Latin-1
+# uses the regex instead, so the table never grows per code point.
+_LATIN1_NON_WORD = {
+    code: " " for code in range(256) if not (chr(code).isalnum() or chr(code) == "_")
+}
+_WORD_RE = re.compile(r"\w+")
+
+
 def _mock_generate(prompt: str) -> str:
     return f"(mock) you said: {prompt}"
 
 
-def _mock_title(text: str) -> str:
-    cleaned = _clean_text(text)
-    if not cleaned:
-        return "Untitled"
+def _mock_title(cleaned: str) -> str:
     words = cleaned.split()
     title = " ".join(words[:12])
     return title[:80]
 
 
-def _mock_summary(text: str) -> str:
-    cleaned = _clean_text(text)
-    if not cleaned:
-        return "No content."
+def _mock_summary(cleaned: str) -> str:
     if len(cleaned) <= 150:
         return cleaned
     clipped = cleaned[:150].rstrip()
     return f"{clipped}..."
 
 
-def _mock_keywords(text: str) -> list[str]:
-    import re
-
-    words = re.findall(r"\b\w+\b", text.lower())
+def _mock_keywords(cleaned: str) -> list[str]:
+    lowered = cleaned.lower()
+    if lowered.isascii() or max(lowered) <= "\xff":
+        words = lowered.translate(_LATIN1_NON_WORD).split()
+    else:
+        words = _WORD_RE.findall(lowered)
     return sorted(set(words))
 
 
+_COALESCE_WINDOW = 0.02
+_COALESCE_MAX = 10
+_GEN_Q: asyncio.Queue[tuple[str, asyncio.Future[str]]] | None = None
+_DISPATCHES: set[asyncio.Task[None]] = set()
+
+
+async def _complete_prompt(prompt: str) -> str:
+    return await _chat(None, prompt, 0.2)
+
+
+async def _dispatch(batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+    try:
+        results = await asyncio.gather(
+            *(_complete_prompt(prompt) for prompt, _ in batch), return_exceptions=True
+        )
+    except asyncio.CancelledError:
+        for _, fut in batch:
+            fut.cancel()
+        raise
+    for (_, fut), result in zip(batch, results):
+        if fut.done():
+            continue
+        if isinstance(result, BaseException):
+            fut.set_exception(result)
+        else:
+            fut.set_result(result)
+
+
+def _drain_prompts(batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+    assert _GEN_Q is not None
+    while len(batch) < _COALESCE_MAX and not _GEN_Q.empty():
+        batch.append(_GEN_Q.get_nowait())
+
+
+async def _coalescer() -> None:
+    """Group /generate prompts arriving within a short window into one dispatch.
+
+    Each prompt in a group is still its own completion request; grouping only
+    starts them together on the shared client.
+    """
+
+    assert _GEN_Q is not None
+    while True:
+        batch = [await _GEN_Q.get()]
+        _drain_prompts(batch)
+        if len(batch) < _COALESCE_MAX:
+            try:
+                await asyncio.sleep(_COALESCE_WINDOW)
+            except asyncio.CancelledError:
+                for _, fut in batch:
+                    fut.cancel()
+                raise
+            _drain_prompts(batch)
+        task = asyncio.create_task(_dispatch(batch))
+        _DISPATCHES.add(task)
+        task.add_done_callback(_DISPATCHES.discard)
+
+
+async def _submit_prompt(prompt: str) -> str:
+    if _GEN_Q is None:
+        return await _complete_prompt(prompt)
+    fut: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    _GEN_Q.put_nowait((prompt, fut))
+    return await fut
+
+
 @app.post("/generate")
-def generate(inp: GenIn) -> dict[str, str]:
+async def generate(inp: GenIn) -> dict[str, str]:
     if MOCK:
         payload = {"text": _mock_generate(inp.prompt)}
     else:
-        _ensure_api_key()
-        try:
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": inp.prompt}],
-                temperature=0.2,
-            )
-        except Exception as exc:  # pragma: no cover - defensive
-            raise HTTPException(status_code=500, detail=str(exc)) from exc
-        payload = {"text": resp.choices[0].message.content}
+        payload = {"text": await _submit_prompt(inp.prompt)}
 
-    _record_log("generate", inp.model_dump(), payload)
+    _record_log("generate", inp, payload)
     return payload
 
 
-@app.post("/title")
-def title(inp: TextIn) -> dict[str, str]:
-    cleaned = _clean_text(inp.text)
+_SSE_DONE = b"data: [DONE]\n\n"
+
+
+def _sse(text: str) -> bytes:
+    return b"data: " + orjson.dumps({"text": text}) + b"\n\n"
+
+
+async def _once(text: str) -> t.AsyncGenerator[str, None]:
+    yield text
+
+
+async def _open_stream(
+    system: t.Mapping[str, str] | None, user: str, temperature: float
+) -> t.AsyncGenerator[str, None]:
+    """Start a streamed completion and return an iterator over its text deltas.
+
+    The request is issued before the response starts so connection failures
+    still surface as a 500 instead of a truncated event stream.
+    """
+
+    _ensure_api_key()
+    try:
+        stream = await _create_completion(
+            model=_MODEL, messages=_messages(system, user), temperature=temperature, stream=True
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    async def deltas() -> t.AsyncGenerator[str, None]:
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+    return deltas()
+
+
+def _event_stream(
+    mode: str,
+    inp: BaseModel,
+    deltas: t.AsyncGenerator[str, None],
+    on_complete: t.Callable[[str], None] | None = None,
+) -> StreamingResponse:
+    """Forward ``deltas`` as server-sent events and log the joined text at the end.
+
+    If the client goes away mid-stream the source is closed and whatever was
+    sent so far is logged; ``on_complete`` only runs for a finished stream.
+    """
+
+    async def events() -> t.AsyncIterator[bytes]:
+        parts: list[str] = []
+        completed = False
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield _sse(delta)
+            completed = True
+            yield _SSE_DONE
+        finally:
+            await deltas.aclose()
+            text = "".join(parts)
+            if completed and on_complete is not None:
+                on_complete(text)
+            _record_log(mode, inp, {"text": text})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/generate/stream")
+async def generate_stream(inp: GenIn) -> StreamingResponse:
     if MOCK:
-        result = _mock_title(inp.text)
+        deltas = _once(_mock_generate(inp.prompt))
     else:
-        if not cleaned:
-            result = "Untitled"
-        else:
-            _ensure_api_key()
-            try:
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "Provide a concise title."},
-                        {"role": "user", "content": cleaned},
-                    ],
-                    temperature=0.1,
-                )
-            except Exception as exc:  # pragma: no cover - defensive
-                raise HTTPException(status_code=500, detail=str(exc)) from exc
-            result = resp.choices[0].message.content
+        deltas = await _open_stream(None, inp.prompt, 0.2)
+    return _event_stream("generate", inp, deltas)
+
+
+@app.post("/title")
+async def title(inp: TextIn) -> dict[str, str]:
+    cleaned = _clean_text(inp.text)
     if not cleaned:
         result = "Untitled"
-    elif not result.strip():
-        result = "Untitled"
+    elif MOCK:
+        result = _mock_title(cleaned)
+    else:
+        result = _cache_get("title", cleaned, 0.1)
+        if result is None:
+            result = await _chat(_TITLE_SYS, cleaned, 0.1)
+            _cache_put("title", cleaned, 0.1, result)
+        if not result.strip():
+            result = "Untitled"
     payload = {"text": result}
-    _record_log("title", inp.model_dump(), payload)
+    _record_log("title", inp, payload)
     return payload
 
 
 @app.post("/summarize")
-def summarize(inp: TextIn) -> dict[str, str]:
+async def summarize(inp: TextIn) -> dict[str, str]:
     cleaned = _clean_text(inp.text)
-    if MOCK:
-        summary = _mock_summary(inp.text)
+    if not cleaned:
+        summary = "No content."
+    elif MOCK:
+        summary = _mock_summary(cleaned)
     else:
-        if not cleaned:
-            summary = "No content."
-        else:
-            _ensure_api_key()
-            try:
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "Summarize the following text."},
-                        {"role": "user", "content": cleaned},
-                    ],
-                    temperature=0.3,
-                )
-            except Exception as exc:  # pragma: no cover - defensive
-                raise HTTPException(status_code=500, detail=str(exc)) from exc
-            summary = resp.choices[0].message.content
-
-    payload = {"text": summary if cleaned else "No content."}
-    _record_log("summarize", inp.model_dump(), payload)
+        summary = _cache_get("summarize", cleaned, 0.3)
+        if summary is None:
+            summary = await _chat(_SUMMARY_SYS, cleaned, 0.3)
+            _cache_put("summarize", cleaned, 0.3, summary)
+
+    payload = {"text": summary}
+    _record_log("summarize", inp, payload)
     return payload
 
 
+@app.post("/summarize/stream")
+async def summarize_stream(inp: TextIn) -> StreamingResponse:
+    cleaned = _clean_text(inp.text)
+    on_complete: t.Callable[[str], None] | None = None
+    if not cleaned:
+        deltas = _once("No content.")
+    elif MOCK:
+        deltas = _once(_mock_summary(cleaned))
+    elif (cached := _cache_get("summarize", cleaned, 0.3)) is not None:
+        deltas = _once(cached)
+    else:
+        deltas = await _open_stream(_SUMMARY_SYS, cleaned, 0.3)
+        on_complete = functools.partial(_cache_put, "summarize", cleaned, 0.3)
+
+    return _event_stream("summarize", inp, deltas, on_complete)
+
+
 @app.post("/keywords")
-def keywords(inp: TextIn) -> dict[str, list[str]]:
+async def keywords(inp: TextIn) -> dict[str, list[str]]:
     cleaned = _clean_text(inp.text)
-    if MOCK:
-        words = _mock_keywords(inp.text)
+    if not cleaned:
+        words = []
+    elif MOCK:
+        words = _mock_keywords(cleaned)
     else:
-        if not cleaned:
-            words = []
-        else:
-            _ensure_api_key()
-            try:
-                resp = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Extract distinct keywords as a comma separated list.",
-                        },
-                        {"role": "user", "content": cleaned},
-                    ],
-                    temperature=0.0,
-                )
-            except Exception as exc:  # pragma: no cover - defensive
-                raise HTTPException(status_code=500, detail=str(exc)) from exc
-            words = [w.strip().lower() for w in resp.choices[0].message.content.split(",") if w.strip()]
+        words = _cache_get("keywords", cleaned, 0.0)
+        if words is None:
+            reply = await _chat(_KEYWORDS_SYS, cleaned, 0.0)
+            words = [w.strip().lower() for w in reply.split(",") if w.strip()]
             words = sorted(dict.fromkeys(words))
+            _cache_put("keywords", cleaned, 0.0, words)
 
     payload = {"keywords": words}
-    _record_log("keywords", inp.model_dump(), payload)
+    _record_log("keywords", inp, payload)
     return payload
 
 
-@app.get("/history")
-def history(limit: int = 10) -> list[dict[str, t.Any]]:
-    with _db() as con:
-        cur = con.execute(
-            "SELECT ts, mode, input, output FROM logs ORDER BY id DESC LIMIT ?",
-            (limit,),
-        )
-        rows = [
+def _batch_lines(prompts: t.Sequence[GenIn]) -> bytes:
+    """Encode ``prompts`` as Batch API JSONL, one chat completion per line."""
+
+    return b"".join(
+        orjson.dumps(
             {
-                "ts": row["ts"],
-                "mode": row["mode"],
-                "input": json.loads(row["input"]),
-                "output": json.loads(row["output"]),
+                "custom_id": f"generate-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": _MODEL,
+                    "messages": _messages(None, item.prompt),
+                    "temperature": 0.2,
+                },
             }
-            for row in cur.fetchall()
-        ]
-    return rows
+        )
+        + b"\n"
+        for i, item in enumerate(prompts)
+    )
+
+
+def _ensure_batch_available() -> None:
+    if MOCK:
+        raise HTTPException(status_code=501, detail="Batch API is not available in mock mode")
+    _ensure_api_key()
+
+
+@app.post("/batch")
+async def batch(items: list[GenIn]) -> dict[str, t.Any]:
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one prompt")
+    _ensure_batch_available()
+    try:
+        upload = await client.files.create(
+            file=("batch.jsonl", _batch_lines(items)),
+            purpose="batch",
+        )
+        job = await client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return {"id": job.id, "status": job.status}
+
+
+@app.get("/batch/{batch_id}")
+async def batch_status(batch_id: str) -> dict[str, t.Any]:
+    _ensure_batch_available()
+    try:
+        job = await client.batches.retrieve(batch_id)
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return {
+        "id": job.id,
+        "status": job.status,
+        "output_file_id": job.output_file_id,
+        "error_file_id": job.error_file_id,
+    }
+
+
+# ``id`` is the rowid alias, so ORDER BY id DESC walks the table b-tree
+# backwards without a sort or a separate index.
+_HISTORY_SQL = "SELECT ts, mode, input, output FROM logs ORDER BY id DESC LIMIT ?"
+
+
+_HISTORY_FETCH = 256
+
+
+def _history_row(row: sqlite3.Row) -> dict[str, t.Any]:
+    return {
+        "ts": row["ts"],
+        "mode": row["mode"],
+        "input": orjson.loads(row["input"]),
+        "output": orjson.loads(row["output"]),
+    }
+
+
+def _read_history(limit: int) -> list[dict[str, t.Any]]:
+    cur = _db().execute(_HISTORY_SQL, (limit,))
+    return [_history_row(row) for row in cur.fetchmany(limit)]
+
+
+def _stream_history(limit: int) -> t.Iterator[bytes]:
+    """Yield the history as a JSON array, one ``fetchmany`` chunk at a time."""
+
+    cur = _db().execute(_HISTORY_SQL, (limit,))
+    yield b"["
+    sep = b""
+    while rows := cur.fetchmany(_HISTORY_FETCH):
+        yield sep + b",".join(orjson.dumps(_history_row(row)) for row in rows)
+        sep = b","
+    yield b"]"
+
+
+@app.get("/history", response_model=list[dict[str, t.Any]])
+async def history(limit: int = 10) -> list[dict[str, t.Any]] | StreamingResponse:
+    if LOG_Q is None:
+        # Outside the lifespan nothing else has created the table yet.
+        _init_db()
+    await _flush_logs()
+    # Small pages are read in one go so errors still map to a 500 and the
+    # response goes through the typed model; only large ones are streamed.
+    if 0 <= limit <= _HISTORY_FETCH:
+        return await asyncio.to_thread(_read_history, limit)
+    return StreamingResponse(_stream_history(limit), media_type="application/json")
 
 
 @app.get("/ui")
 def ui() -> FileResponse:
     static_dir = pathlib.Path(__file__).parent / "static"
     return FileResponse(static_dir / "index.html")
-
-
-_init_db()
@@ -1,5 +1,7 @@
+import http.server
 import os
 import pathlib
+import threading
 
 import pytest
 from importlib.machinery import SourceFileLoader
@@ -17,11 +19,18 @@ mod = SourceFileLoader("app_mod", str(pathlib.Path("app-api/main.py").resolve())
 client = TestClient(mod.app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def app_lifespan():
+    with client:
+        yield
+
+
 @pytest.fixture(autouse=True)
 def clear_logs():
+    client.portal.call(mod._flush_logs)  # type: ignore[attr-defined]
     mod._init_db()  # type: ignore[attr-defined]
-    with mod._db() as con:  # type: ignore[attr-defined]
-        con.execute("DELETE FROM logs")
+    with mod._WRITE_LOCK:  # type: ignore[attr-defined]
+        mod._db().execute("DELETE FROM logs")  # type: ignore[attr-defined]
     yield
 
 
@@ -97,3 +106,249 @@ def test_history_records_latest_calls():
     assert first["output"]["text"].startswith("second")
     assert first["ts"].endswith("Z")
     assert payload[1]["mode"] == "generate"
+
+
+def test_response_cache_lru_and_temperature(monkeypatch):
+    monkeypatch.setattr(mod, "_RESP_CACHE", mod.collections.OrderedDict())
+    monkeypatch.setattr(mod, "_RESP_CACHE_SIZE", 2)
+    mod._cache_put("title", "a", 0.1, "A")
+    mod._cache_put("title", "b", 0.1, "B")
+    assert mod._cache_get("title", "a", 0.1) == "A"
+    mod._cache_put("title", "c", 0.1, "C")
+    assert mod._cache_get("title", "b", 0.1) is None
+    assert mod._cache_get("title", "a", 0.1) == "A"
+    assert mod._cache_get("summarize", "a", 0.1) is None
+    mod._cache_put("title", "hot", 0.9, "H")
+    assert mod._cache_get("title", "hot", 0.1) is None
+
+
+def test_batch_lines_encode_chat_requests():
+    lines = mod._batch_lines([mod.GenIn(prompt="one"), mod.GenIn(prompt="two")]).splitlines()
+    assert len(lines) == 2
+    first = mod.orjson.loads(lines[0])
+    assert first["custom_id"] == "generate-0"
+    assert first["url"] == "/v1/chat/completions"
+    assert first["body"]["messages"] == [{"role": "user", "content": "one"}]
+
+
+def test_batch_rejects_empty_and_mock():
+    assert client.post("/batch", json=[]).status_code == 400
+    assert client.post("/batch", json=[{"prompt": "hi"}]).status_code == 501
+    assert client.get("/batch/batch_123").status_code == 501
+
+
+def test_generate_coalescer_resolves_each_prompt(monkeypatch):
+    seen = []
+
+    async def fake_complete(prompt):
+        seen.append(prompt)
+        return prompt.upper()
+
+    monkeypatch.setattr(mod, "_complete_prompt", fake_complete)
+    monkeypatch.setattr(mod, "_COALESCE_MAX", 3)
+
+    async def submit_all():
+        return await mod.asyncio.gather(*(mod._submit_prompt(p) for p in "abcde"))
+
+    assert client.portal.call(submit_all) == ["A", "B", "C", "D", "E"]
+    assert sorted(seen) == list("abcde")
+
+
+def test_rate_limiter_waits_for_reset():
+    assert mod._parse_reset("6m0s") == 360.0
+    assert mod._parse_reset("20ms") == 0.02
+    assert mod._parse_reset(None) == 0.0
+
+    limiter = mod.RateLimiter()
+    limiter.update(
+        {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "50ms"}
+    )
+
+    async def reserve():
+        start = mod.time.monotonic()
+        async with limiter.reserve(10):
+            pass
+        return mod.time.monotonic() - start
+
+    assert client.portal.call(reserve) >= 0.04
+    assert limiter.req_tokens is None
+
+
+def test_generate_stream_mock_sends_events():
+    response = client.post("/generate/stream", json={"prompt": "hi"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.split("\n\n") if line]
+    assert events[-1] == "data: [DONE]"
+    assert "(mock) you said: hi" in events[0]
+    history = client.get("/history", params={"limit": 1}).json()
+    assert history[0]["mode"] == "generate"
+    assert history[0]["output"]["text"] == "(mock) you said: hi"
+
+
+def test_summarize_stream_blank():
+    response = client.post("/summarize/stream", json={"text": " "})
+    assert response.status_code == 200
+    assert 'data: {"text":"No content."}' in response.text
+
+
+def test_history_streams_across_fetch_chunks():
+    rows = [
+        ("2024-01-01T00:00:00Z", "generate", '{"prompt":"p"}', f'{{"text":"{i}"}}')
+        for i in range(300)
+    ]
+    mod._write_logs(rows)
+    response = client.get("/history", params={"limit": 300})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    payload = response.json()
+    assert len(payload) == 300
+    assert payload[0]["output"] == {"text": "299"}
+    assert payload[-1]["output"] == {"text": "0"}
+
+
+def test_flush_logs_ignores_rows_queued_later(monkeypatch):
+    write_logs = mod._write_logs
+
+    def slow_write(rows):
+        mod.time.sleep(0.01)
+        write_logs(rows)
+
+    monkeypatch.setattr(mod, "_write_logs", slow_write)
+
+    async def flush_under_load():
+        async def produce():
+            while True:
+                mod._record_log("generate", mod.GenIn(prompt="x"), {"text": "y"})
+                await mod.asyncio.sleep(0.002)
+
+        producer = mod.asyncio.create_task(produce())
+        await mod.asyncio.sleep(0.05)
+        try:
+            await mod.asyncio.wait_for(mod._flush_logs(), 1)
+        finally:
+            producer.cancel()
+
+    client.portal.call(flush_under_load)
+
+
+def test_generate_coalescer_skips_window_when_full(monkeypatch):
+    async def fake_complete(prompt):
+        return prompt
+
+    monkeypatch.setattr(mod, "_complete_prompt", fake_complete)
+    monkeypatch.setattr(mod, "_COALESCE_MAX", 3)
+    monkeypatch.setattr(mod, "_COALESCE_WINDOW", 5)
+
+    async def submit_full_batch():
+        prompts = (mod._submit_prompt(p) for p in "abc")
+        return await mod.asyncio.wait_for(mod.asyncio.gather(*prompts), 1)
+
+    assert client.portal.call(submit_full_batch) == ["a", "b", "c"]
+
+
+def test_event_stream_closes_source_and_logs_on_disconnect():
+    closed = []
+    completed = []
+
+    async def source():
+        try:
+            yield "a"
+            yield "b"
+        finally:
+            closed.append(True)
+
+    async def disconnect_after_first_event():
+        response = mod._event_stream(
+            "generate", mod.GenIn(prompt="p"), source(), completed.append
+        )
+        await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+
+    client.portal.call(disconnect_after_first_event)
+    assert closed == [True]
+    assert completed == []
+    history = client.get("/history", params={"limit": 1}).json()
+    assert history[0]["output"] == {"text": "a"}
+
+
+def test_record_log_outside_lifespan_creates_table(monkeypatch, tmp_path):
+    monkeypatch.setattr(mod, "_DB_PATH", tmp_path / "fresh.db")
+    monkeypatch.setattr(mod, "_CONN", None)
+    monkeypatch.setattr(mod, "LOG_Q", None)
+    mod._record_log("generate", mod.GenIn(prompt="p"), {"text": "t"})
+    con = mod._db()
+    try:
+        assert [row["mode"] for row in con.execute("SELECT mode FROM logs")] == ["generate"]
+    finally:
+        con.close()
+
+
+def test_history_outside_lifespan_on_fresh_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(mod, "_DB_PATH", tmp_path / "fresh.db")
+    monkeypatch.setattr(mod, "_CONN", None)
+    monkeypatch.setattr(mod, "LOG_Q", None)
+    try:
+        response = TestClient(mod.app).get("/history")
+        assert response.status_code == 200
+        assert response.json() == []
+    finally:
+        mod._db().close()
+
+
+class _FakeOpenAI(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"id":"c","object":"chat.completion","created":0,"model":"gpt-4o-mini",' \
+            b'"choices":[{"index":0,"finish_reason":"stop",' \
+            b'"message":{"role":"assistant","content":"fake title"}}]}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_openai_calls_work_after_lifespan_restart(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setattr(mod, "LOG_Q", None)
+    monkeypatch.setattr(mod, "_GEN_Q", None)
+
+    async def start_and_call():
+        async with mod.lifespan(mod.app):
+            return await mod._chat(mod._TITLE_SYS, "hello", 0.1)
+
+    try:
+        assert mod.asyncio.run(start_and_call()) == "fake title"
+        assert mod.asyncio.run(start_and_call()) == "fake title"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keywords_mock_splits_on_unicode_punctuation():
+    response = client.post("/keywords", json={"text": "Hello, world — it’s “great”… naïve—test"})
+    assert response.status_code == 200
+    assert response.json()["keywords"] == ["great", "hello", "it", "naïve", "s", "test", "world"]
+
+
+def test_history_small_page_errors_return_500(monkeypatch):
+    mod._write_logs([("2024-01-01T00:00:00Z", "generate", "not json", "{}")])
+    monkeypatch.setattr(mod, "LOG_Q", None)
+    response = TestClient(mod.app, raise_server_exceptions=False).get("/history")
+    assert response.status_code == 500
+
+
+def test_keywords_mock_latin1_matches_regex_and_table_stays_fixed():
+    size = len(mod._LATIN1_NON_WORD)
+    latin1 = "Ça va? naïve_test «bien» ¡sí! 3½"
+    assert mod._mock_keywords(latin1) == sorted(set(mod.re.findall(r"\b\w+\b", latin1.lower())))
+    mod._mock_keywords("".join(map(chr, range(0x100, 0x3000))))
+    assert len(mod._LATIN1_NON_WORD) == size